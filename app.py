@@ -1,4 +1,4 @@
-from flask import Flask, request, render_template, redirect, url_for
+from flask import Flask, request, stream_template, redirect, url_for
 import sys
 import os
 
@@ -21,8 +21,9 @@ def index():
     # 1. Fetch data from our custom DB
     table = db.get_table("employees")
     rows = table.select()
-    # 2. Render the HTML template (Flask looks in the 'templates' folder automatically)
-    return render_template('index.html', rows=rows)
+    # 2. Stream the HTML template (Flask looks in the 'templates' folder automatically)
+    # Jinja sends chunks as it walks the rows instead of building the whole page first
+    return stream_template('index.html', rows=rows)
 
 @app.route('/add', methods=['POST'])
 def add_entry():
@@ -50,5 +51,8 @@ def delete_entry(id_val):
     return redirect(url_for('index'))
 
 if __name__ == '__main__':
+    # Waitress instead of the Werkzeug dev server: one process with a thread pool,
+    # each thread gets its own SQLite connection.
+    from waitress import serve
     print("Starting Web App on http://127.0.0.1:5000")
-    app.run(debug=False, port=5000)
\ No newline at end of file
+    serve(app, host="127.0.0.1", port=5000, threads=8)
\ No newline at end of file
@@ -1,143 +1,301 @@
 import json
 import os
+import sqlite3
+import threading
+import weakref
+
+# Every table lives in one SQLite file
+DB_PATH = "data/mdb.sqlite3"
+
+# Schema type names -> SQLite column types. Anything else is stored as TEXT.
+# TEXT affinity stores numbers as text and compares them as text, so a "str" key
+# inserted as 1 is still found by "1" (what str() on every key used to guarantee).
+# "INT", not "INTEGER": an INTEGER primary key would become the rowid, which rejects
+# non-numeric keys and silently assigns one when the key is NULL.
+SQL_TYPES = {"str": "TEXT", "int": "INT", "float": "REAL"}
+SCHEMA_TYPES = {sql: kind for kind, sql in SQL_TYPES.items()}
+SCHEMA_TYPES["INTEGER"] = "int"
+
+def _quote(identifier):
+    """Quotes a table/column name so user input can't break out of the SQL."""
+    return '"' + identifier.replace('"', '""') + '"'
+
+def _dict_row(cursor, row):
+    """Row factory that gives back plain dicts, same as the old in-memory rows."""
+    return {col[0]: value for col, value in zip(cursor.description, row)}
+
+def _legacy_rows(name, pk_col):
+    """
+    Reads a table from the old JSON storage (data/<name>.json + data/<name>.log),
+    so data written before the switch to SQLite gets imported once.
+    """
+    rows = {}
+    snapshot_path, log_path = f"data/{name}.json", f"data/{name}.log"
+    if os.path.exists(snapshot_path):
+        try:
+            with open(snapshot_path, 'rb') as f:
+                for row in json.load(f).get("rows", []):
+                    # SQLite would take any number of rows without a PK, the old engine never did
+                    if row.get(pk_col) is not None:
+                        rows[str(row[pk_col])] = row
+        except json.JSONDecodeError:
+            print(f"Error: Could not decode {snapshot_path}. Skipping it.")
+
+    if os.path.exists(log_path):
+        with open(log_path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash mid-append, nothing after it is valid
+                    break
+                if "__del__" in entry:
+                    rows.pop(str(entry["__del__"]), None)
+                elif entry.get(pk_col) is not None:
+                    rows.setdefault(str(entry[pk_col]), entry)
+    return list(rows.values())
+
+class _ThreadToken:
+    """Sits in a thread's local storage, so it's collected when the thread ends."""
+
+def _close_conn(conns, key):
+    """Closes a connection whose thread is gone (or at exit). Never holds on to the Database."""
+    conn = conns.pop(key, None)
+    if conn is not None:
+        conn.close()
 
 class Table:
     """
     Represents a single table in our database.
-    Data is stored in memory as a list of dictionaries and saved to a JSON file.
+    A thin wrapper around a SQLite table: SQLite does the storage, indexing and crash safety.
     """
-    def __init__(self, name, schema, pk_col):
+    def __init__(self, name, schema, pk_col, db):
         self.name = name
         self.schema = schema        # e.g., {"id": "int", "name": "str"}
         self.pk_col = pk_col        # The column used as the Primary Key
-        self.rows = []              # The actual data: [{'id': 1, ...}, ...]
-        self.index = {}             # HashMap for O(1) lookups: { '1': row_index }
-        self.filepath = f"data/{name}.json"
-        
-        # Load data if the file already exists
-        self.load()
-
-    def load(self):
-        """Loads the table data from the JSON file if it exists."""
-        if os.path.exists(self.filepath):
-            try:
-                with open(self.filepath, 'r') as f:
-                    data = json.load(f)
-                    self.rows = data.get("rows", [])
-                    # We trust the file, but we must rebuild the memory index
-                    self.rebuild_index()
-            except json.JSONDecodeError:
-                print(f"Error: Could not decode {self.filepath}. Starting empty.")
-
-    def save(self):
-        """Persists the current state to disk."""
-        # Ensure the data directory exists
-        os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
-        
-        with open(self.filepath, 'w') as f:
-            json.dump({
-                "schema": self.schema,
-                "pk_col": self.pk_col, # Save metadata too!
-                "rows": self.rows
-            }, f, indent=4)
-
-    def rebuild_index(self):
-        """Rebuilds the O(1) index mapping PK -> Row Index."""
-        self.index = {}
-        for idx, row in enumerate(self.rows):
-            key = str(row.get(self.pk_col)) # Always stringify keys for consistency
-            self.index[key] = idx
+        self._schema_keys = frozenset(schema)  # For one-shot validation of inserted rows
+        self._schema_keys_tuple = tuple(schema)  # Column order, for zipping positional values
+        self._schema_len = len(schema)
+        self._db = db               # Hands out this thread's connection
+        self._indexed = {pk_col}    # Columns we know have an index
+
+        # The SQL never changes for a table, so build it once
+        table = _quote(name)
+        cols = ", ".join(_quote(col) for col in schema)
+        self._sql_insert = f"INSERT INTO {table} ({cols}) VALUES ({', '.join('?' * len(schema))})"
+        self._sql_select = f"SELECT * FROM {table}"
+        self._sql_get = self._sql_where(pk_col)
+        self._sql_delete = f"DELETE FROM {table} WHERE {_quote(pk_col)} = ?"
+
+    def _sql_where(self, col):
+        # Plain concatenation: names may contain {}, so they must never go through str.format
+        return self._sql_select + " WHERE " + _quote(col) + " = ?"
+
+    def create(self):
+        """Creates the SQLite table if needed. Returns True if it didn't exist yet."""
+        conn = self._db.conn
+        # PRAGMA table_info matches names case-insensitively, like the rest of SQLite,
+        # so "EMP" finds a table created as "emp"
+        info = conn.execute(f"PRAGMA table_info({_quote(self.name)})").fetchall()
+        if info:
+            # Already there: only fine if it's the same table, otherwise inserts would
+            # go to the wrong columns and duplicates be checked on the wrong key
+            cols = [col["name"] for col in info]
+            pk_col = next((col["name"] for col in info if col["pk"]), None)
+            if set(cols) != self._schema_keys or pk_col != self.pk_col:
+                raise ValueError(
+                    f"Table '{self.name}' already exists with columns {cols} "
+                    f"and Primary Key '{pk_col}'."
+                )
+            return False
+
+        cols = ", ".join(
+            f"{_quote(col)} {SQL_TYPES.get(kind, 'TEXT')}" for col, kind in self.schema.items()
+        )
+        conn.execute(
+            f"CREATE TABLE {_quote(self.name)} ({cols}, PRIMARY KEY({_quote(self.pk_col)}))"
+        )
+        return True
+
+    def import_rows(self, rows):
+        """Bulk-inserts rows. The caller owns the transaction."""
+        self._db.conn.executemany(
+            self._sql_insert,
+            ([row.get(col) for col in self._schema_keys_tuple] for row in rows),
+        )
 
     def validate_schema(self, row_dict):
         """Ensures the inserted row matches the table schema."""
+        # A valid row has exactly the schema's columns, one set comparison covers that
+        row_keys = row_dict.keys()
+        if row_keys == self._schema_keys:
+            return
+
+        # Slow path only: walk in row/schema order so the first offending column is reported
         # 1. Check for extra fields
         for col in row_dict:
-            if col not in self.schema:
+            if col not in self._schema_keys:
                 raise ValueError(f"Column '{col}' not in schema {list(self.schema.keys())}")
-        
+
         # 2. Check for missing fields
         for col in self.schema:
             if col not in row_dict:
                 raise ValueError(f"Missing column '{col}'")
 
     def insert(self, row_dict):
-        """Inserts a new row with O(1) duplicate checking."""
+        """Inserts a new row, SQLite's PK index does the duplicate checking."""
         self.validate_schema(row_dict)
 
-        # Check Primary Key Constraint
-        pk_val = str(row_dict[self.pk_col])
-        if pk_val in self.index:
-            raise ValueError(f"Duplicate entry for Primary Key '{pk_val}'")
+        # SQLite lets a non-integer PRIMARY KEY hold any number of NULLs, so check it ourselves
+        pk_val = row_dict[self.pk_col]
+        if pk_val is None:
+            raise ValueError(f"Primary Key '{self.pk_col}' can't be empty.")
 
-        # Insert and Save
-        self.rows.append(row_dict)
-        self.index[pk_val] = len(self.rows) - 1
-        self.save()
+        try:
+            self._db.conn.execute(
+                self._sql_insert, [row_dict[col] for col in self._schema_keys_tuple]
+            )
+        except sqlite3.IntegrityError as e:
+            if str(e).startswith("UNIQUE constraint failed"):
+                raise ValueError(f"Duplicate entry for Primary Key '{pk_val}'")
+            raise ValueError(f"Could not insert row: {e}")
+        except sqlite3.Error as e:
+            # e.g. "database is locked", or a value SQLite can't store (a list, a dict...)
+            raise ValueError(f"Could not insert row: {e}")
         return f"Inserted 1 row into {self.name}."
 
     def select(self, where_col=None, where_val=None):
         """
-        Retrieves rows. 
-        OPTIMIZATION: Uses Index if searching by Primary Key.
+        Retrieves rows.
+        OPTIMIZATION: Uses the PK index, or builds an index on first use for other columns.
         """
+        conn = self._db.conn
+
         # Case 1: Select All
         if not where_col:
-            return self.rows
+            return conn.execute(self._sql_select).fetchall()
 
-        # Case 2: Index Lookup (O(1))
+        # Case 2: Index Lookup
         if where_col == self.pk_col:
-            idx = self.index.get(str(where_val))
-            if idx is not None:
-                return [self.rows[idx]]
+            row = self.get(where_val)
+            if row is not None:
+                return [row]
+            return []
+
+        # Unknown columns can't match anything (and must never reach the SQL)
+        if where_col not in self._schema_keys:
             return []
 
-        # Case 3: Full Table Scan (O(n))
-        results = []
-        for row in self.rows:
-            # simple string comparison for now
-            if str(row.get(where_col)) == str(where_val):
-                results.append(row)
-        return results
+        # Case 3: Secondary Index Lookup, the index is created the first time we filter on it
+        if where_col not in self._indexed:
+            # The length prefix keeps names unique: table a_b/col c and table a/col b_c differ
+            index_name = f"idx_{len(self.name)}_{self.name}_{where_col}"
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_quote(index_name)} "
+                f"ON {_quote(self.name)} ({_quote(where_col)})"
+            )
+            self._indexed.add(where_col)
+        return conn.execute(self._sql_where(where_col), (where_val,)).fetchall()
+
+    def get(self, pk_val):
+        """Returns the row with this Primary Key, or None. No list wrapping for single lookups."""
+        return self._db.conn.execute(self._sql_get, (pk_val,)).fetchone()
 
     def delete(self, pk_val):
         """Deletes a row by Primary Key."""
-        pk_str = str(pk_val)
-        if pk_str not in self.index:
-            raise ValueError(f"Key {pk_str} not found.")
-
-        # Filter out the row (Soft delete is harder, so we rewrite the list)
-        self.rows = [row for row in self.rows if str(row[self.pk_col]) != pk_str]
-        
-        # Rebuild index and save
-        self.rebuild_index()
-        self.save()
+        try:
+            cursor = self._db.conn.execute(self._sql_delete, (pk_val,))
+        except sqlite3.Error as e:
+            raise ValueError(f"Could not delete row: {e}")
+        if cursor.rowcount == 0:
+            raise ValueError(f"Key {pk_val} not found.")
         return "Row deleted."
 
 class Database:
     """
     The main interface that manages multiple tables.
     """
-    def __init__(self):
+    def __init__(self, path=DB_PATH):
         self.tables = {}
-        # Auto-load existing tables from data/ folder could go here
-        # For this MVP, we will rely on 'create_table' or explicit loading
+        self.path = path
+
+        # SQLite connections shouldn't be shared between threads, so each thread gets its own.
+        # In WAL mode readers on one connection don't block the writer on another.
+        self._local = threading.local()
+        self._conns = {}  # id of the owning thread's _ThreadToken -> connection
+
+    @property
+    def conn(self):
+        """This thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            # Closes the connection when this thread ends, so short-lived threads don't
+            # leak file handles, and at exit for the ones still alive (checkpointing the WAL)
+            token = self._local.token = _ThreadToken()
+            self._conns[id(token)] = conn
+            weakref.finalize(token, _close_conn, self._conns, id(token))
+        return conn
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # isolation_level=None: every statement commits on its own, like the old per-insert save
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.row_factory = _dict_row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # fsync at checkpoints, not every commit
+        conn.execute("PRAGMA cache_size=-65536")   # 64 MB page cache
+        return conn
+
+    def close(self):
+        """Closes every connection; the last one to close checkpoints the WAL."""
+        # popitem is atomic, so a thread ending meanwhile can't close a connection twice
+        while self._conns:
+            try:
+                _, conn = self._conns.popitem()
+            except KeyError:
+                break
+            conn.close()
+        self._local = threading.local()
 
     def create_table(self, name, schema, pk_col):
         if name in self.tables:
             raise ValueError(f"Table {name} already loaded.")
-        
-        self.tables[name] = Table(name, schema, pk_col)
+
+        table = Table(name, schema, pk_col, self)
+        # Create and import together, so a failed import doesn't leave behind an empty table
+        # that makes every later open think the import already happened
+        conn = self.conn
+        # IMMEDIATE takes the write lock up front: a deferred BEGIN reads first and can then
+        # fail with "database is locked" when another connection starts writing in between
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if table.create():
+                # Brand new in SQLite: bring over anything left in the old JSON storage
+                rows = _legacy_rows(name, pk_col)
+                if rows:
+                    table.import_rows(rows)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        self.tables[name] = table
         return f"Table '{name}' created/loaded."
 
     def get_table(self, name):
         if name not in self.tables:
-            # Try to lazy-load if file exists
-            if os.path.exists(f"data/{name}.json"):
-                 # HACK: To load existing, we need to read the file to find the schema/PK
-                 # This is a bit circular, but works for the challenge
-                 with open(f"data/{name}.json", 'r') as f:
-                     meta = json.load(f)
-                     return self.create_table(name, meta['schema'], meta['pk_col'])
-            
-            raise ValueError(f"Table '{name}' does not exist.")
+            # Try to lazy-load if SQLite already has it, the schema comes from the table itself
+            info = self.conn.execute(f"PRAGMA table_info({_quote(name)})").fetchall()
+            if info:
+                schema = {col["name"]: SCHEMA_TYPES.get(col["type"], "str") for col in info}
+                pk_col = next(col["name"] for col in info if col["pk"])
+                self.create_table(name, schema, pk_col)
+            elif os.path.exists(f"data/{name}.json"):
+                # Left over from the old JSON storage, its snapshot still knows the schema/PK
+                with open(f"data/{name}.json", 'rb') as f:
+                    meta = json.load(f)
+                self.create_table(name, meta['schema'], meta['pk_col'])
+            else:
+                raise ValueError(f"Table '{name}' does not exist.")
         return self.tables[name]
\ No newline at end of file
@@ -1,4 +1,4 @@
-import shlex  # Helps parse quoted strings like "John Doe"
+import re  # Helps parse quoted strings like "John Doe"
 import sys
 import os
 
@@ -7,6 +7,25 @@ sys.path.append(os.getcwd())
 
 from src.db import Database
 
+# A token is a run of "double quoted", 'single quoted' and plain non-space pieces, glued
+# together like shlex does ('"a"b' -> 'ab'). A quote with no partner lands in the last group.
+# Unlike shlex, backslashes are plain characters, there are no escapes.
+# Compiled once; much cheaper per line than shlex's character-by-character state machine.
+_TOK_RE = re.compile(r'''(?:"[^"]*"|'[^']*'|[^\s"'])+|(["'])''')
+_QUOTED_RE = re.compile(r""""([^"]*)"|'([^']*)'""")
+
+def tokenize(query):
+    """Splits a query into tokens: 'INSERT "Startups Law"' -> ["INSERT", "Startups Law"]"""
+    tokens = []
+    for match in _TOK_RE.finditer(query):
+        if match.group(1):
+            raise ValueError("No closing quotation")
+        token = match.group(0)
+        if '"' in token or "'" in token:
+            token = _QUOTED_RE.sub(r"\1\2", token)
+        tokens.append(token)
+    return tokens
+
 def main():
     db = Database()
     print("="*60)
@@ -22,6 +41,8 @@ def main():
                 continue
                 
             if query.lower() in ["exit", "quit"]:
+                # Close the SQLite connections before leaving
+                db.close()
                 print("Goodbye!")
                 break
                 
@@ -30,9 +51,9 @@ def main():
                 continue
 
             # 2. Parse the Command
-            # shlex.split handles quotes properly: 'INSERT "Startups Law"' -> ["INSERT", "Startups Law"]
-            tokens = shlex.split(query)
-            command = tokens[0].upper()
+            tokens = tokenize(query)
+            upper = [t.upper() for t in tokens]  # Keywords are case-insensitive, uppercase once
+            command = upper[0]
 
             # 3. Execute Logic
             if command == "CREATE":
@@ -63,30 +84,30 @@ def main():
                 table = db.get_table(table_name)
                 
                 # Check if values match schema count
-                if len(values) != len(table.schema):
-                    print(f"Error: Table has {len(table.schema)} columns but you provided {len(values)} values.")
+                if len(values) != table._schema_len:
+                    print(f"Error: Table has {table._schema_len} columns but you provided {len(values)} values.")
                     continue
 
                 # Zip schema keys with values to create the dictionary
-                row_data = dict(zip(table.schema.keys(), values))
+                row_data = dict(zip(table._schema_keys_tuple, values))
                 print(table.insert(row_data))
 
             elif command == "SELECT":
                 # Syntax 1: SELECT * FROM <table>
                 # Syntax 2: SELECT * FROM <table> WHERE <col> = <val>
                 
-                if "FROM" not in [t.upper() for t in tokens]:
+                if "FROM" not in upper:
                     print("Error: Syntax -> SELECT * FROM <name> [WHERE <col> = <val>]")
                     continue
                 
-                from_index = [t.upper() for t in tokens].index("FROM")
+                from_index = upper.index("FROM")
                 table_name = tokens[from_index + 1]
                 table = db.get_table(table_name)
 
                 # Check for WHERE clause
                 results = []
-                if "WHERE" in [t.upper() for t in tokens]:
-                    where_index = [t.upper() for t in tokens].index("WHERE")
+                if "WHERE" in upper:
+                    where_index = upper.index("WHERE")
                     col = tokens[where_index + 1]
                     # skip the "=" sign if user typed it
                     val_index = where_index + 2
@@ -94,7 +115,12 @@ def main():
                         val_index += 1
                     val = tokens[val_index]
                     
-                    results = table.select(where_col=col, where_val=val)
+                    if col == table.pk_col:
+                        # PK lookups hit at most one row, only wrap it for printing
+                        row = table.get(val)
+                        results = [row] if row is not None else []
+                    else:
+                        results = table.select(where_col=col, where_val=val)
                 else:
                     results = table.select()
 
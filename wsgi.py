@@ -0,0 +1,4 @@
+# WSGI entry point for production servers, e.g.:
+#   waitress-serve --threads=8 wsgi:app
+# A single process with threads is plenty; each thread gets its own SQLite connection.
+from app import app